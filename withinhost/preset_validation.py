@@ -0,0 +1,142 @@
+from typing import Callable, Dict, List
+import time
+
+from simulation_runner import SimulationRunner
+from src.person_objects.solver_presets import SOLVER_PRESETS
+
+
+def run_preset(file_string: str, drift_function: Callable, solver_preset: str) -> Dict:
+    """
+    Runs the cohort once under a single solver preset.
+
+    Returns:
+        A dictionary with the wall time of the run, and the time to clear and memory cells
+        collected from the population.
+    """
+    sim = SimulationRunner(
+        file_string, drift_function=drift_function, solver_preset=solver_preset
+    )
+    start = time.perf_counter()
+    sim.run_simulation()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "seconds": elapsed,
+        "time_to_clear": sim.population.collect_time_to_clear(),
+        "memory_cells": sim.population.collect_memory_cells_by_year(),
+    }
+
+
+def max_deviation(results: List[Dict], baseline: List[Dict]) -> float:
+    """
+    Largest absolute difference between matching entries of two population collections.
+
+    Both arguments are lists (one per person) of dictionaries keyed by genetic code, whose
+    values are either a single number or a list of numbers. Exposures present in only one of
+    the collections count as an infinite deviation.
+    """
+    if len(results) != len(baseline):
+        raise Exception(
+            f"Populations differ in size: {len(results)} versus {len(baseline)} people."
+        )
+
+    deviation = 0.0
+    for person, baseline_person in zip(results, baseline):
+        if person.keys() != baseline_person.keys():
+            return float("inf")
+        for genetic_code, value in person.items():
+            baseline_value = baseline_person[genetic_code]
+            if not isinstance(value, list):
+                value, baseline_value = [value], [baseline_value]
+            if len(value) != len(baseline_value):
+                return float("inf")
+            deviation = max(
+                [deviation] + [abs(x - y) for x, y in zip(value, baseline_value)]
+            )
+    return float(deviation)
+
+
+def validate_solver_presets(
+    file_string: str,
+    drift_function: Callable = lambda t: 5 * t,
+    presets: List[str] = list(SOLVER_PRESETS),
+    baseline: str = "reference",
+) -> Dict[str, Dict]:
+    """
+    Runs the cohort under each preset and compares it against the baseline preset.
+
+    Args:
+        file_string (str): Path to the cohort file, as accepted by `Population`.
+        drift_function (Callable): Drift function passed to `SimulationRunner`.
+        presets (List[str]): Names of the presets to compare.
+        baseline (str): Name of the preset the others are compared against.
+
+    Returns:
+        A dictionary keyed by preset name, holding the wall time, the speedup over the baseline,
+        and the maximum deviation in time to clear and in memory cells.
+    """
+    baseline_run = run_preset(file_string, drift_function, baseline)
+
+    report = {}
+    for preset in presets:
+        run = (
+            baseline_run
+            if preset == baseline
+            else run_preset(file_string, drift_function, preset)
+        )
+        report[preset] = {
+            "seconds": run["seconds"],
+            "speedup": baseline_run["seconds"] / run["seconds"],
+            "time_to_clear_deviation": max_deviation(
+                run["time_to_clear"], baseline_run["time_to_clear"]
+            ),
+            "memory_cell_deviation": max_deviation(
+                run["memory_cells"], baseline_run["memory_cells"]
+            ),
+        }
+    return report
+
+
+def cheapest_accurate_preset(
+    report: Dict[str, Dict],
+    time_to_clear_tolerance: float,
+    memory_cell_tolerance: float,
+) -> str:
+    """
+    Returns the fastest preset in the report whose deviations are within both tolerances.
+
+    Raises an exception when no preset is accurate enough, which can only happen when the
+    baseline preset is not part of the report.
+    """
+    accurate = [
+        preset
+        for preset, row in report.items()
+        if row["time_to_clear_deviation"] <= time_to_clear_tolerance
+        and row["memory_cell_deviation"] <= memory_cell_tolerance
+    ]
+    if not accurate:
+        raise Exception(
+            f"No preset in {list(report)} is within {time_to_clear_tolerance} time to clear "
+            f"and {memory_cell_tolerance} memory cells of the baseline."
+        )
+    return min(accurate, key=lambda preset: report[preset]["seconds"])
+
+
+def print_report(report: Dict[str, Dict]) -> None:
+    print(f"{'preset':<12}{'seconds':>10}{'speedup':>10}{'max dTTC':>12}{'max dM':>12}")
+    for preset, row in report.items():
+        print(
+            f"{preset:<12}{row['seconds']:>10.3f}{row['speedup']:>10.2f}"
+            f"{row['time_to_clear_deviation']:>12.2e}{row['memory_cell_deviation']:>12.2e}"
+        )
+
+
+if __name__ == "__main__":
+    report = validate_solver_presets("birth_data.csv")
+    print_report(report)
+    print(
+        "Cheapest preset within 1e-2 time to clear and 1 memory cell:",
+        cheapest_accurate_preset(
+            report, time_to_clear_tolerance=1e-2, memory_cell_tolerance=1
+        ),
+    )
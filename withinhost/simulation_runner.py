@@ -1,14 +1,33 @@
-from typing import List, Callable, Tuple
+from typing import Dict, List, Callable, Tuple
 
 from src.person_objects.population import Population
+from src.person_objects.trajectory_recorder import TrajectoryRecorder
+from src.person_objects.exposure_cache import ExposureCache
 from src.viral_objects.virus import Virus
 
+import pandas as pd
 import matplotlib.pyplot as plt
 
 
 class SimulationRunner:
-    def __init__(self, file_string: str, drift_function: Callable = lambda t: 5 * t):
-        self.population = Population(file_string=file_string)
+    def __init__(
+        self,
+        file_string: str,
+        drift_function: Callable = lambda t: 5 * t,
+        solver_preset="default",
+        trajectory_recorder: TrajectoryRecorder = None,
+        exposure_cache: ExposureCache = None,
+        data_frame: pd.DataFrame = None,
+        person_ids: List = None,
+    ):
+        self.population = Population(
+            file_string=file_string,
+            solver_preset=solver_preset,
+            trajectory_recorder=trajectory_recorder,
+            exposure_cache=exposure_cache,
+            data_frame=data_frame,
+            person_ids=person_ids,
+        )
         self.year_range, self.virus_properties = self.generate_virus_history(
             drift_function=drift_function
         )
@@ -28,6 +47,30 @@ class SimulationRunner:
         for year in self.year_range:
             self.population.expose_to_virus(year, self.virus_properties[year])
 
+    def collect_columnar_results(self) -> Dict[str, List]:
+        """
+        Collects the results of a finished simulation as equal-length columns, one row per
+        person and exposure.
+
+        Returns:
+            A dictionary with the columns `person_id`, `genetic_code`, `time_to_clear` and
+            `memory_cells` (the person's total memory cells after that exposure).
+        """
+        columns = {
+            "person_id": [],
+            "genetic_code": [],
+            "time_to_clear": [],
+            "memory_cells": [],
+        }
+        for person in self.population.list_of_people:
+            memory_cells = person.collect_memory_cells_by_year()
+            for genetic_code, ttc in person.collect_time_to_clear().items():
+                columns["person_id"].append(person.id)
+                columns["genetic_code"].append(genetic_code)
+                columns["time_to_clear"].append(ttc)
+                columns["memory_cells"].append(sum(memory_cells[genetic_code]))
+        return columns
+
     def visualize_simulation(self, img_name):
         plt.style.use("bmh")
         time_to_clear = self.population.collect_time_to_clear()
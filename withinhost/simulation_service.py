@@ -0,0 +1,335 @@
+from typing import Dict, List, Tuple
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import asyncio
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from simulation_runner import SimulationRunner
+from src.person_objects.exposure_cache import ExposureCache
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8799
+
+# Longest request or response line, in bytes, read from a connection.
+STREAM_LIMIT = 16 * 2**20
+
+# Cohorts a worker keeps loaded besides the preloaded ones, least recently used first out.
+WORKER_COHORT_CACHE_SIZE = 4
+
+# Drift functions a job can ask for by name, with keyword arguments from the request.
+DRIFT_FUNCTIONS = {
+    "linear": lambda t, slope=5: slope * t,
+    "alternating": lambda t, amplitude=100, period=8, slope=0.1: amplitude
+    * ((t % period) >= period / 2)
+    + slope * t,
+}
+
+# Per-process state of a worker, filled in by `initialize_worker`. Cohorts are stored with
+# the `cohort_version` they were read at.
+_worker_cohorts: OrderedDict = OrderedDict()
+_worker_preloaded_cohorts: set = set()
+_worker_exposure_cache: ExposureCache = None
+
+
+def initialize_worker(
+    cohorts: List[str], cache_directory: str = None, cache_max_bytes: int = None
+) -> None:
+    """
+    Loads the cohorts and opens the exposure cache once per worker process.
+    """
+    global _worker_exposure_cache
+    _worker_preloaded_cohorts.update(cohorts)
+    for file_string in cohorts:
+        load_cohort(file_string)
+    if cache_directory is not None:
+        _worker_exposure_cache = ExposureCache(cache_directory, cache_max_bytes)
+
+
+def warm_up() -> None:
+    pass
+
+
+def cohort_version(file_string: str) -> Tuple[int, int]:
+    """
+    Returns the modification time and size of a cohort file, which change when it is edited.
+    """
+    stat = os.stat(file_string)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_cohort(file_string: str) -> pd.DataFrame:
+    """
+    Returns a cohort from the worker's cache, reading it again if the file has changed.
+    """
+    version = cohort_version(file_string)
+    if file_string in _worker_cohorts and _worker_cohorts[file_string][0] == version:
+        _worker_cohorts.move_to_end(file_string)
+        return _worker_cohorts[file_string][1]
+
+    _worker_cohorts[file_string] = (version, pd.read_csv(file_string))
+    _worker_cohorts.move_to_end(file_string)
+
+    extra = [name for name in _worker_cohorts if name not in _worker_preloaded_cohorts]
+    for name in extra[: max(0, len(extra) - WORKER_COHORT_CACHE_SIZE)]:
+        del _worker_cohorts[name]
+    return _worker_cohorts[file_string][1]
+
+
+def run_job(request: Dict) -> Dict[str, List]:
+    """
+    Runs a single simulation job inside a worker process.
+
+    Args:
+        request (Dict): A job with the keys `cohort` (path to the cohort file), and optionally
+            `person_ids`, `drift` (a name in `DRIFT_FUNCTIONS`), `drift_args` and `solver_preset`.
+
+    Returns:
+        The columnar results of `SimulationRunner.collect_columnar_results`.
+    """
+    drift = request.get("drift", "linear")
+    if drift not in DRIFT_FUNCTIONS:
+        raise Exception(
+            f"Unknown drift function {drift}; expected one of {list(DRIFT_FUNCTIONS)}."
+        )
+    drift_args = request.get("drift_args", {})
+
+    sim = SimulationRunner(
+        request["cohort"],
+        drift_function=lambda t: DRIFT_FUNCTIONS[drift](t, **drift_args),
+        solver_preset=request.get("solver_preset", "default"),
+        exposure_cache=_worker_exposure_cache,
+        data_frame=load_cohort(request["cohort"]),
+        person_ids=request.get("person_ids"),
+    )
+    sim.run_simulation()
+    return to_builtin(sim.collect_columnar_results())
+
+
+def to_builtin(value):
+    """
+    Converts numpy scalars inside nested lists and dictionaries to plain Python values.
+    """
+    if isinstance(value, dict):
+        return {key: to_builtin(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [to_builtin(item) for item in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def job_key(request: Dict) -> str:
+    """
+    Hashes a request together with the version of its cohort file, so that editing the cohort
+    gives resubmitted requests a new key.
+    """
+    keyed = {"request": request, "cohort_version": cohort_version(request["cohort"])}
+    return hashlib.sha256(json.dumps(keyed, sort_keys=True).encode()).hexdigest()
+
+
+class SimulationService:
+    """
+    Long-lived local service that runs simulation jobs on warm worker processes.
+
+    Jobs arrive as one JSON object per line over a localhost TCP connection, and each is
+    answered with one JSON line: `{"ok": true, "result": {...}}` or `{"ok": false, "error": ...}`.
+    Identical requests on an unchanged cohort file share a single in-flight run, and recent
+    results are kept in memory. If a worker process dies, the pool is restarted and the job that
+    was running reports the failure.
+
+    #### Attributes:
+
+    - `cohorts`: cohort files preloaded into every worker.
+    - `max_workers`: the number of worker processes.
+    - `max_concurrent_jobs`: the number of jobs running at once; further jobs wait their turn.
+    - `result_cache_size`: the number of finished results kept for reuse.
+    - `cache_directory`, `cache_max_bytes`: settings of the on-disk `ExposureCache` shared by
+      the workers, which is not used when `cache_directory` is None.
+    - `stream_limit`: the longest request line accepted. A longer line is answered with an
+      error and the connection is closed.
+    """
+
+    def __init__(
+        self,
+        cohorts: List[str] = [],
+        max_workers: int = 2,
+        max_concurrent_jobs: int = None,
+        result_cache_size: int = 128,
+        cache_directory: str = None,
+        cache_max_bytes: int = None,
+        stream_limit: int = STREAM_LIMIT,
+    ):
+        self.cohorts = list(cohorts)
+        self.max_workers = max_workers
+        self.max_concurrent_jobs = max_concurrent_jobs or max_workers
+        self.result_cache_size = result_cache_size
+        self.cache_directory = cache_directory
+        self.cache_max_bytes = cache_max_bytes
+        self.stream_limit = stream_limit
+
+        self.executor: ProcessPoolExecutor = None
+        self.server: asyncio.AbstractServer = None
+        self.job_slots: asyncio.Semaphore = None
+        self.in_flight: Dict[str, asyncio.Task] = {}
+        self.results: OrderedDict = OrderedDict()
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        """
+        Starts the worker processes, waits for them to load, and starts listening.
+        """
+        self.job_slots = asyncio.Semaphore(self.max_concurrent_jobs)
+        await self.start_workers()
+        self.server = await asyncio.start_server(
+            self.handle_connection, host, port, limit=self.stream_limit
+        )
+        return self.server
+
+    async def start_workers(self) -> None:
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=initialize_worker,
+            initargs=(self.cohorts, self.cache_directory, self.cache_max_bytes),
+        )
+
+        # Submitting one no-op per worker starts every process now rather than on first use.
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *[
+                loop.run_in_executor(self.executor, warm_up)
+                for _ in range(self.max_workers)
+            ]
+        )
+
+    async def restart_workers(self, broken: ProcessPoolExecutor) -> None:
+        """
+        Replaces a broken worker pool, unless another job has already replaced it.
+        """
+        if self.executor is not broken:
+            return
+        broken.shutdown(wait=False)
+        await self.start_workers()
+
+    async def close(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.executor is not None:
+            await asyncio.to_thread(self.executor.shutdown, wait=True)
+
+    async def submit(self, request: Dict) -> Dict[str, List]:
+        """
+        Returns the results of a job, reusing a finished or in-flight run of the same request.
+        """
+        key = job_key(request)
+        if key in self.results:
+            self.results.move_to_end(key)
+            return self.results[key]
+
+        if key not in self.in_flight:
+            self.in_flight[key] = asyncio.create_task(self.run(key, request))
+        # Shielded so that one cancelled caller does not cancel the run for the others.
+        return await asyncio.shield(self.in_flight[key])
+
+    async def run(self, key: str, request: Dict) -> Dict[str, List]:
+        try:
+            async with self.job_slots:
+                executor = self.executor
+                loop = asyncio.get_running_loop()
+                try:
+                    result = await loop.run_in_executor(executor, run_job, request)
+                except BrokenProcessPool:
+                    await self.restart_workers(executor)
+                    raise Exception(
+                        "A worker process died while running this job; "
+                        "the workers have been restarted."
+                    )
+        finally:
+            del self.in_flight[key]
+
+        self.results[key] = result
+        if len(self.results) > self.result_cache_size:
+            self.results.popitem(last=False)
+        return result
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    # The rest of the oversized line cannot be told apart from the next request.
+                    response = {
+                        "ok": False,
+                        "error": f"Request is longer than {self.stream_limit} bytes.",
+                    }
+                    writer.write(json.dumps(response).encode() + b"\n")
+                    await writer.drain()
+                    break
+                if not line:
+                    break
+
+                try:
+                    response = {"ok": True, "result": await self.submit(json.loads(line))}
+                except Exception as e:
+                    response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            # The client went away; there is nobody left to answer.
+            pass
+        finally:
+            writer.close()
+
+
+async def request_simulation(
+    request: Dict,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    limit: int = STREAM_LIMIT,
+) -> Dict[str, List]:
+    """
+    Sends one job to a running `SimulationService` and returns its columnar results.
+    """
+    reader, writer = await asyncio.open_connection(host, port, limit=limit)
+    try:
+        writer.write(json.dumps(request).encode() + b"\n")
+        await writer.drain()
+        line = await reader.readline()
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+    if not line:
+        raise Exception("The simulation service closed the connection without a response.")
+    response = json.loads(line)
+
+    if not response["ok"]:
+        raise Exception(response["error"])
+    return response["result"]
+
+
+async def serve(service: SimulationService, host: str, port: int) -> None:
+    server = await service.start(host, port)
+    print(f"Simulation service listening on {host}:{port}")
+    try:
+        await server.serve_forever()
+    finally:
+        await service.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        serve(
+            SimulationService(cohorts=["birth_data.csv"], cache_directory=".exposure_cache"),
+            DEFAULT_HOST,
+            DEFAULT_PORT,
+        )
+    )
@@ -1,9 +1,11 @@
 from typing import List, Tuple, Callable, Dict
 from src.viral_objects.virus import Virus
+from src.person_objects.solver_presets import SolverPreset, get_solver_preset
+from src.person_objects.trajectory_recorder import TrajectoryRecorder
+from src.person_objects.exposure_cache import ExposureCache
 
 import numpy as np
 from scipy.linalg import block_diag
-from scipy.integrate import solve_ivp
 import scipy
 import itertools
 
@@ -16,7 +18,17 @@ PLASMA_DECAY = 0.5
 
 
 class AffinityMaturationModel:
-    def __init__(self):
+    def __init__(
+        self,
+        solver_preset="default",
+        trajectory_recorder: TrajectoryRecorder = None,
+        person_id="",
+        exposure_cache: ExposureCache = None,
+    ):
+        self.solver_preset: SolverPreset = get_solver_preset(solver_preset)
+        self.trajectory_recorder = trajectory_recorder
+        self.exposure_cache = exposure_cache
+        self.person_id = person_id
         self.antibody_models: List[AntibodyModel] = []
         self.time_to_clear: Dict = {}
         self.total_memory_cell_count: Dict = {}
@@ -34,9 +46,33 @@ class AffinityMaturationModel:
         # Case 1: person is actually not exposed.
 
         # Case 2: person is exposed.
+        exposure = len(self.antibody_models)
+        record = (
+            self.trajectory_recorder is not None
+            and self.trajectory_recorder.should_record(self.person_id, exposure)
+        )
+
         # 1. Add another model to the system for the current virus
         self.antibody_models.append(AntibodyModel(virus))
+        try:
+            return self.solve_exposure(virus, exposure, record)
+        except Exception:
+            # Leave the person as they were before an exposure that could not be solved.
+            self.antibody_models.pop()
+            raise
+
+    def solve_exposure(self, virus: Virus, exposure: int, record: bool) -> float:
+        """
+        Solves the system for an exposure whose antibody model has already been added.
+
+        Args:
+            virus (Virus): A Virus object that represents the virus the person is exposed to.
+            exposure (int): The exposure number within the person's history.
+            record (bool): Whether the trajectory recorder keeps this exposure's trajectory.
 
+        Returns:
+            exposure_results (float): A float that represents the person's immunity response to the virus.
+        """
         # Ultimately, working towards setting up ODE to solve.
         # A. Collect baseline conditions
         # B. Collect differential equations for each model
@@ -44,7 +80,14 @@ class AffinityMaturationModel:
             virus
         )
         init_values = list(starting_values)
-        print(f"starting_values = {init_values}")
+
+        # C. Reuse a stored solution for identical inputs; recorded exposures always solve.
+        cache_key = None
+        if self.exposure_cache is not None and not record:
+            cache_key = self.exposure_cache_key(virus, init_values)
+            cached_solution = self.exposure_cache.get(cache_key)
+            if cached_solution is not None:
+                return self.extract_ode_solution(cached_solution, virus)
 
         # D. Set up ODE solver
         # E. Solve
@@ -58,19 +101,57 @@ class AffinityMaturationModel:
         plasma_zero_cross.terminal = True
         plasma_zero_cross.direction = -1
 
-        ode_solution = solve_ivp(
+        ode_solution = self.solver_preset.solve(
             fun=differential_equations,
-            t_span=[0, 100],
             y0=init_values,
             events=[virus_zero_cross, plasma_zero_cross],
+            capture_trajectory=record,
         )
-        # F. Get results
-        print(ode_solution)
+        # F. Get results; only recorded exposures keep their trajectory.
+        if record:
+            self.trajectory_recorder.record(self.person_id, exposure, ode_solution)
+        # Stored before anything is written back, so a failed write cannot leave a partial update.
+        if cache_key is not None and self.infection_cleared(ode_solution):
+            try:
+                self.exposure_cache.put(cache_key, ode_solution)
+            except OSError:
+                # The cache is best-effort; a full or read-only disk must not fail the exposure.
+                pass
         # G. Write memory cell back to each model
         exposure_results = self.extract_ode_solution(ode_solution, virus)
 
         return exposure_results
 
+    def infection_cleared(self, ode_soln) -> bool:
+        """
+        Returns whether the solution reached both the virus and the plasma zero crossing.
+        """
+        return len(ode_soln.t_events[0]) > 0 and len(ode_soln.y_events[1]) > 0
+
+    def exposure_cache_key(self, virus: Virus, init_values: List[float]) -> str:
+        """
+        Builds the exposure cache key for solving the current system against a virus.
+
+        Args:
+            virus (Virus): The virus the person is exposed to.
+            init_values (List[float]): The initial state vector of the ODE system.
+
+        Returns:
+            key (str): The key of the exposure in the cache.
+        """
+        return self.exposure_cache.key(
+            initial_state=init_values,
+            genetic_codes=[model.virus_genetic_code for model in self.antibody_models],
+            virus=virus,
+            constants={
+                "PLASMA_TO_MEMORY_FACTOR": PLASMA_TO_MEMORY_FACTOR,
+                "MEMORY_TO_PLASMA_FACTOR": MEMORY_TO_PLASMA_FACTOR,
+                "MEMORY_DECAY": MEMORY_DECAY,
+                "PLASMA_DECAY": PLASMA_DECAY,
+            },
+            solver_preset=self.solver_preset,
+        )
+
     def extract_ode_solution(self, ode_soln, virus: Virus) -> float:
         """
         This method extracts the solution from the ODE solver and updates the memory cells for the given virus.
@@ -82,6 +163,11 @@ class AffinityMaturationModel:
         Returns:
             memory_cell_count (float): A float that represents the total number of memory cells for the given virus.
         """
+        if not self.infection_cleared(ode_soln):
+            raise Exception(
+                f"Infection with {virus} did not clear within "
+                f"{self.solver_preset.max_horizon} time units: {ode_soln.message}"
+            )
 
         self.time_to_clear[virus.genetic_code] = ode_soln.t_events[0][0]
         self.total_memory_cell_count[virus.genetic_code] = self.write_memory_cells(
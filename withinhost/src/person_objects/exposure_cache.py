@@ -0,0 +1,218 @@
+from typing import Dict, List
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+from scipy.optimize import OptimizeResult
+
+from src.person_objects.solver_presets import SolverPreset
+from src.viral_objects.virus import Virus
+
+# Bump when the stored format or the model equations change, so old entries are never reused.
+CACHE_VERSION = 1
+
+
+class ExposureCache:
+    """
+    On-disk cache of exposure solutions, shared across runs and across parallel workers.
+
+    Entries are keyed by a hash of everything that determines an exposure's solution, and hold
+    only the event times and states that `AffinityMaturationModel.extract_ode_solution` reads.
+
+    #### Attributes:
+
+    - `directory`: the directory entries are stored in, one `.npz` file per entry.
+    - `max_bytes`: the size bound of the directory. None leaves the cache unbounded.
+    - `low_water_fraction`: the share of `max_bytes` that eviction trims the directory down to,
+      so that one eviction makes room for many writes.
+    - `rescan_interval`: the number of writes after which the directory is rescanned even if
+      this process's size estimate is under `max_bytes`, to pick up other workers' writes.
+    - `stale_temp_seconds`: the age after which a temporary file is taken to belong to a killed
+      writer and removed by eviction.
+
+    Entries are written to a temporary file and renamed into place, so readers never see a
+    partial entry and concurrent writers of the same entry simply replace each other.
+    Reading an entry refreshes its modification time, which is what eviction orders by.
+    An entry that cannot be read is treated as a miss and removed.
+
+    Scanning the directory is kept off the common path: each process keeps a running estimate
+    of the directory size, adds its own writes to it, and only scans and trims when the estimate
+    goes over `max_bytes` or every `rescan_interval` writes.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = None,
+        low_water_fraction: float = 0.8,
+        rescan_interval: int = 1000,
+        stale_temp_seconds: float = 3600,
+    ):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.low_water_fraction = low_water_fraction
+        self.rescan_interval = rescan_interval
+        self.stale_temp_seconds = stale_temp_seconds
+        self.hits = 0
+        self.misses = 0
+
+        self.estimated_bytes = 0
+        self.writes_since_scan = 0
+        if max_bytes is not None:
+            self.evict()
+
+    def key(
+        self,
+        initial_state: List[float],
+        genetic_codes: List[float],
+        virus: Virus,
+        constants: Dict[str, float],
+        solver_preset: SolverPreset,
+    ) -> str:
+        """
+        Builds a stable hash of the inputs to an exposure.
+
+        Args:
+            initial_state (List[float]): The initial state vector of the ODE system.
+            genetic_codes (List[float]): Genetic codes of the person's antibody models, in order.
+            virus (Virus): The virus the person is exposed to.
+            constants (Dict[str, float]): The model constants used by the differential equations.
+            solver_preset (SolverPreset): The solver settings used to solve the exposure.
+
+        Returns:
+            key (str): A hexadecimal SHA-256 digest.
+        """
+        digest = hashlib.sha256()
+        digest.update(f"v{CACHE_VERSION}".encode())
+        digest.update(np.asarray(initial_state, dtype="<f8").tobytes())
+        digest.update(np.asarray(genetic_codes, dtype="<f8").tobytes())
+        digest.update(
+            np.asarray([virus.viral_load, virus.genetic_code], dtype="<f8").tobytes()
+        )
+        settings = {
+            "constants": constants,
+            "method": solver_preset.method,
+            "rtol": solver_preset.rtol,
+            "atol": solver_preset.atol,
+            "max_step": solver_preset.max_step,
+            "horizon": solver_preset.horizon,
+            "max_horizon": solver_preset.max_horizon,
+        }
+        digest.update(json.dumps(settings, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def get(self, key: str) -> OptimizeResult:
+        """
+        Returns the cached solution for a key, or None if there is no entry.
+        """
+        path = self.path(key)
+        try:
+            with np.load(path, allow_pickle=False) as entry:
+                n_events = int(entry["n_events"])
+                ode_soln = OptimizeResult(
+                    t_events=[entry[f"t_events_{i}"] for i in range(n_events)],
+                    y_events=[entry[f"y_events_{i}"] for i in range(n_events)],
+                    message="Loaded from exposure cache.",
+                )
+        except FileNotFoundError:
+            # Missing, or evicted by another worker.
+            self.misses += 1
+            return None
+        except Exception:
+            # Truncated or corrupted entry; drop it so the solution is stored again.
+            self.misses += 1
+            self.remove(path)
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            # Evicted since the load, or a read-only cache; the entry was still valid.
+            pass
+
+        self.hits += 1
+        return ode_soln
+
+    def put(self, key: str, ode_soln) -> None:
+        """
+        Stores the event times and states of a solution, evicting entries when the estimated
+        size of the cache goes over `max_bytes`.
+        """
+        arrays = {"n_events": np.asarray(len(ode_soln.t_events))}
+        for i, (t_events, y_events) in enumerate(
+            zip(ode_soln.t_events, ode_soln.y_events)
+        ):
+            arrays[f"t_events_{i}"] = np.asarray(t_events)
+            arrays[f"y_events_{i}"] = np.asarray(y_events)
+
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                np.savez(temp_file, **arrays)
+            size = os.path.getsize(temp_path)
+            os.replace(temp_path, self.path(key))
+        except BaseException:
+            self.remove(temp_path)
+            raise
+
+        if self.max_bytes is None:
+            return
+        self.estimated_bytes += size
+        self.writes_since_scan += 1
+        if (
+            self.estimated_bytes > self.max_bytes
+            or self.writes_since_scan >= self.rescan_interval
+        ):
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        Scans the cache, removes stale temporary files, and, if the cache is over `max_bytes`,
+        removes least recently used entries until it fits in the low-water mark.
+        """
+        now = time.time()
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith((".npz", ".tmp")):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+
+            if entry.name.endswith(".tmp"):
+                # Left behind by a writer killed between creating and renaming it.
+                if now - stat.st_mtime > self.stale_temp_seconds:
+                    self.remove(entry.path)
+                else:
+                    total += stat.st_size
+                continue
+
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+        if self.max_bytes is not None and total > self.max_bytes:
+            low_water = self.low_water_fraction * self.max_bytes
+            for _, size, path in sorted(entries):
+                if total <= low_water:
+                    break
+                self.remove(path)
+                total -= size
+
+        self.estimated_bytes = total
+        self.writes_since_scan = 0
+
+    def remove(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            # Another worker removed it first, or the cache directory is read-only.
+            pass
@@ -4,6 +4,8 @@ from src.person_objects.affinity_maturation_model import (
     AffinityMaturationModel,
 )
 
+from src.person_objects.trajectory_recorder import TrajectoryRecorder
+from src.person_objects.exposure_cache import ExposureCache
 from src.viral_objects.virus import Virus
 
 # First and last year under study
@@ -19,6 +21,9 @@ class Person:
         birth_year: int = FIRST_YEAR,
         covariate_vector: List = [],
         infection_history: List = [],
+        solver_preset="default",
+        trajectory_recorder: TrajectoryRecorder = None,
+        exposure_cache: ExposureCache = None,
     ):
         if len(covariate_vector) != len(infection_history):
             raise Exception("Covariates and Infections must be same length.")
@@ -39,7 +44,12 @@ class Person:
                 f"Infection history by list: {infection_history}"
             )
 
-        self.maturation_model = AffinityMaturationModel()
+        self.maturation_model = AffinityMaturationModel(
+            solver_preset=solver_preset,
+            trajectory_recorder=trajectory_recorder,
+            person_id=self.id,
+            exposure_cache=exposure_cache,
+        )
 
     def set_id(self, id: str) -> None:
         self.id = id
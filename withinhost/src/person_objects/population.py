@@ -1,17 +1,33 @@
+from typing import List
 import pandas as pd
 from src.viral_objects.virus import Virus
 from src.person_objects.person import Person
+from src.person_objects.trajectory_recorder import TrajectoryRecorder
+from src.person_objects.exposure_cache import ExposureCache
 
 
 class Population:
     # TODO next:
     # since we are comparing treatment strategies, each "person" represents a treatment strategy
-    def __init__(self, file_string: str):
+    def __init__(
+        self,
+        file_string: str,
+        solver_preset="default",
+        trajectory_recorder: TrajectoryRecorder = None,
+        exposure_cache: ExposureCache = None,
+        data_frame: pd.DataFrame = None,
+        person_ids: List = None,
+    ):
         """
         Expects data to be read in as a long format.
+
+        An already loaded `data_frame` is used instead of reading `file_string`, and
+        `person_ids` restricts the population to those IDs.
         """
         self.list_of_people = []
-        df = pd.read_csv(file_string)
+        df = pd.read_csv(file_string) if data_frame is None else data_frame
+        if person_ids is not None:
+            df = df[df["ID"].isin(person_ids)]
 
         for name, info in df.groupby(by="ID"):
             birth_year = info["Year"].min()
@@ -23,6 +39,9 @@ class Population:
                     birth_year=birth_year,
                     covariate_vector=covariate_vector,
                     infection_history=infection_vector,
+                    solver_preset=solver_preset,
+                    trajectory_recorder=trajectory_recorder,
+                    exposure_cache=exposure_cache,
                 )
             )
 
@@ -0,0 +1,169 @@
+from typing import Callable, Dict, List
+
+import numpy as np
+from scipy.integrate import solve_ivp
+from scipy.optimize import OptimizeResult
+
+
+class SolverPreset:
+    """
+    Named collection of `solve_ivp` settings used to solve a single exposure.
+
+    #### Attributes:
+
+    - `name`: the name the preset is registered under in `SOLVER_PRESETS`.
+    - `method`: the integration method passed to `solve_ivp`.
+    - `rtol`, `atol`: relative and absolute tolerances passed to `solve_ivp`.
+    - `max_step`: the largest step the solver may take.
+    - `horizon`: the length of the first integration window.
+    - `max_horizon`: the latest time the solver may integrate to. The window is
+      doubled, continuing from the last state, only while the terminal event has not fired.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        method: str = "RK45",
+        rtol: float = 1e-3,
+        atol: float = 1e-6,
+        max_step: float = np.inf,
+        horizon: float = 100,
+        max_horizon: float = 1600,
+    ):
+        if horizon <= 0 or max_horizon < horizon:
+            raise Exception("Horizon must be positive and no larger than max_horizon.")
+
+        self.name = name
+        self.method = method
+        self.rtol = rtol
+        self.atol = atol
+        self.max_step = max_step
+        self.horizon = horizon
+        self.max_horizon = max_horizon
+
+    def solve(
+        self,
+        fun: Callable,
+        y0: List[float],
+        events: List[Callable],
+        capture_trajectory: bool = False,
+    ):
+        """
+        Solves the system from t=0, extending the horizon until the terminal event fires.
+
+        Args:
+            fun (Callable): The right-hand side of the system, as accepted by `solve_ivp`.
+            y0 (List[float]): The initial state vector.
+            events (List[Callable]): Event functions, as accepted by `solve_ivp`.
+            capture_trajectory (bool): Keep every solver step in `t`/`y`. When False, only the
+                event states and the state at the end of each unfinished window are kept.
+
+        Returns:
+            ode_soln (OptimizeResult): The solution with the `t`, `y`, `t_events` and `y_events`
+                of every integration window joined together.
+        """
+        t_start = 0.0
+        t_end = self.horizon
+        y_start = y0
+        windows = []
+
+        while True:
+            window = solve_ivp(
+                fun=fun,
+                t_span=[t_start, t_end],
+                y0=y_start,
+                method=self.method,
+                rtol=self.rtol,
+                atol=self.atol,
+                max_step=self.max_step,
+                events=events,
+                t_eval=None if capture_trajectory else [t_end],
+            )
+            windows.append(window)
+
+            # Status 1 means a terminal event fired; -1 means the solver failed.
+            if window.status != 0 or t_end >= self.max_horizon:
+                break
+
+            t_start = t_end
+            t_end = min(2 * t_end, self.max_horizon)
+            y_start = window.y[:, -1]
+
+        return self.join_windows(windows, n_states=len(y0))
+
+    def join_windows(self, windows: List, n_states: int) -> OptimizeResult:
+        """
+        Joins the results of consecutive integration windows into a single solution.
+
+        Args:
+            windows (List): Results returned by `solve_ivp`, in time order.
+            n_states (int): The length of the state vector.
+
+        Returns:
+            ode_soln (OptimizeResult): The joined solution.
+        """
+        last = windows[-1]
+        n_events = len(last.t_events)
+
+        t_events = [
+            np.concatenate([window.t_events[i] for window in windows])
+            for i in range(n_events)
+        ]
+        y_events = [
+            np.concatenate(
+                [window.y_events[i].reshape(-1, n_states) for window in windows]
+            )
+            for i in range(n_events)
+        ]
+
+        return OptimizeResult(
+            t=np.concatenate([np.asarray(window.t) for window in windows]),
+            y=np.concatenate(
+                [np.reshape(window.y, (n_states, -1)) for window in windows], axis=1
+            ),
+            t_events=t_events,
+            y_events=y_events,
+            nfev=sum(window.nfev for window in windows),
+            status=last.status,
+            message=last.message,
+            success=last.success,
+        )
+
+    def __str__(self) -> str:
+        return (
+            f"[{self.name}] {self.method} rtol={self.rtol} atol={self.atol} "
+            f"max_step={self.max_step} horizon={self.horizon}..{self.max_horizon}"
+        )
+
+
+# Ordered cheapest to most accurate.
+SOLVER_PRESETS: Dict[str, SolverPreset] = {
+    "fast": SolverPreset(
+        "fast", method="RK23", rtol=1e-2, atol=1e-4, horizon=25, max_horizon=1600
+    ),
+    "default": SolverPreset(
+        "default", method="RK45", rtol=1e-3, atol=1e-6, horizon=100, max_horizon=1600
+    ),
+    "reference": SolverPreset(
+        "reference",
+        method="DOP853",
+        rtol=1e-10,
+        atol=1e-10,
+        max_step=0.05,
+        horizon=100,
+        max_horizon=1600,
+    ),
+}
+
+
+def get_solver_preset(solver_preset) -> SolverPreset:
+    """
+    Looks up a solver preset by name, passing `SolverPreset` instances through unchanged.
+    """
+    if isinstance(solver_preset, SolverPreset):
+        return solver_preset
+    if solver_preset not in SOLVER_PRESETS:
+        raise Exception(
+            f"Unknown solver preset {solver_preset}; expected one of {list(SOLVER_PRESETS)}."
+        )
+    return SOLVER_PRESETS[solver_preset]
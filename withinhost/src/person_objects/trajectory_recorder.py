@@ -0,0 +1,87 @@
+from typing import Dict, List, Tuple
+import hashlib
+import os
+
+import numpy as np
+
+
+class TrajectoryRecorder:
+    """
+    Writes the dense trajectories of a chosen subset of exposures to `.npy` files.
+
+    Exposures are solved in lean mode by default, keeping only the event states. An exposure is
+    solved with its full trajectory only when the recorder selects it, so that one trajectory is
+    held in memory while it is written, and is dropped once the exposure finishes. Recorded
+    trajectories are opened memory-mapped by `load`, so inspecting many of them does not load
+    them all into memory.
+
+    #### Attributes:
+
+    - `directory`: the directory the `.npy` files are written to.
+    - `person_ids`: ids of the persons to record, or None for every person.
+    - `exposures`: exposure numbers (0 for a person's first exposure) to record, or None for all.
+    - `fraction`: the share of persons recorded. The choice is made once per person from a hash
+      of `seed` and the person's id, so a sampled person has every selected exposure recorded.
+    - `seed`: changes which persons `fraction` selects.
+    - `records`: maps `(person_id, exposure)` to the path of its recorded trajectory.
+
+    Each file holds an array of shape `(1 + n_states, n_steps)`; row 0 is time and the remaining
+    rows are the state vector (viral load, then a B-cell and memory cell pair per antibody model).
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        person_ids: List = None,
+        exposures: List[int] = None,
+        fraction: float = 1.0,
+        seed: int = 0,
+    ):
+        if fraction < 0 or fraction > 1:
+            raise Exception("Recording fraction must be between 0 and 1.")
+
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.person_ids = None if person_ids is None else set(person_ids)
+        self.exposures = None if exposures is None else set(exposures)
+        self.fraction = fraction
+        self.seed = seed
+        self.records: Dict[Tuple, str] = {}
+
+    def should_record(self, person_id, exposure: int) -> bool:
+        if self.person_ids is not None and person_id not in self.person_ids:
+            return False
+        if self.exposures is not None and exposure not in self.exposures:
+            return False
+        return self.fraction == 1 or self.person_draw(person_id) < self.fraction
+
+    def person_draw(self, person_id) -> float:
+        """
+        Returns a number in [0, 1) that is fixed for a given seed and person.
+        """
+        digest = hashlib.sha256(f"{self.seed}:{person_id}".encode()).digest()
+        return int.from_bytes(digest[:8], "big") / 2**64
+
+    def record(self, person_id, exposure: int, ode_soln) -> str:
+        """
+        Writes the trajectory of one exposure to disk.
+
+        Args:
+            person_id: The id of the exposed person.
+            exposure (int): The exposure number within that person's history.
+            ode_soln: A solution captured with its full trajectory.
+
+        Returns:
+            path (str): The path of the written `.npy` file.
+        """
+        path = os.path.join(self.directory, f"{person_id}_{exposure}.npy")
+        np.save(path, np.vstack([ode_soln.t, ode_soln.y]).astype(np.float64))
+
+        self.records[(person_id, exposure)] = path
+        return path
+
+    def load(self, person_id, exposure: int) -> np.ndarray:
+        """
+        Opens a recorded trajectory read-only, without loading it into memory.
+        """
+        return np.load(self.records[(person_id, exposure)], mmap_mode="r")
@@ -4,6 +4,7 @@ from withinhost.src.person_objects.affinity_maturation_model import (
     AffinityMaturationModel,
     AntibodyModel,
 )
+from withinhost.src.person_objects.solver_presets import SolverPreset
 
 from withinhost.src.viral_objects.virus import Virus
 
@@ -60,3 +61,24 @@ class AffinityMaturationModelUnitTest(unittest.TestCase):
         amm.exposure_to_virus(virus1)
         amm.exposure_to_virus(virus2)
         amm.exposure_to_virus(virus3)
+
+    def test_exposure_with_solver_preset(self):
+        amm = AffinityMaturationModel(solver_preset="fast")
+        virus1 = Virus(100, 10)
+        virus2 = Virus(100, 20)
+        amm.exposure_to_virus(virus1)
+        amm.exposure_to_virus(virus2)
+
+        self.assertEqual(list(amm.time_to_clear), [10, 20])
+        self.assertEqual(len(amm.total_memory_cell_count[20]), 2)
+
+    def test_unsolved_exposure_leaves_model_unchanged(self):
+        amm = AffinityMaturationModel()
+        amm.exposure_to_virus(Virus(100, 10))
+
+        amm.solver_preset = SolverPreset("too short", horizon=0.5, max_horizon=0.5)
+        with self.assertRaises(Exception):
+            amm.exposure_to_virus(Virus(100, 20))
+
+        self.assertEqual(len(amm.antibody_models), 1)
+        self.assertEqual(list(amm.time_to_clear), [10])
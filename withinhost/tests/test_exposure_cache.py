@@ -0,0 +1,210 @@
+import unittest
+import os
+import tempfile
+import threading
+from unittest import mock
+
+import numpy as np
+from scipy.optimize import OptimizeResult
+from withinhost.src.person_objects.affinity_maturation_model import (
+    AffinityMaturationModel,
+)
+from withinhost.src.person_objects.exposure_cache import ExposureCache
+from withinhost.src.person_objects.solver_presets import SOLVER_PRESETS
+
+from withinhost.src.viral_objects.virus import Virus
+
+
+def make_solution(n_states: int = 3) -> OptimizeResult:
+    return OptimizeResult(
+        t_events=[np.array([1.5]), np.array([4.0])],
+        y_events=[np.zeros((1, n_states)), np.arange(n_states, dtype=float)[None, :]],
+    )
+
+
+class ExposureCacheUnitTest(unittest.TestCase):
+    def test_key(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ExposureCache(directory)
+            args = dict(
+                initial_state=[100, 0, 0],
+                genetic_codes=[10],
+                virus=Virus(100, 10),
+                constants={"PLASMA_DECAY": 0.5},
+                solver_preset=SOLVER_PRESETS["default"],
+            )
+            key = cache.key(**args)
+
+            self.assertEqual(key, cache.key(**args))
+            self.assertNotEqual(key, cache.key(**{**args, "virus": Virus(100, 11)}))
+            self.assertNotEqual(
+                key, cache.key(**{**args, "solver_preset": SOLVER_PRESETS["fast"]})
+            )
+            self.assertNotEqual(
+                key, cache.key(**{**args, "constants": {"PLASMA_DECAY": 0.6}})
+            )
+
+    def test_get_and_put(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ExposureCache(directory)
+            self.assertIsNone(cache.get("missing"))
+
+            cache.put("entry", make_solution())
+            entry = cache.get("entry")
+
+            self.assertEqual(entry.t_events[0][0], 1.5)
+            self.assertTrue(np.array_equal(entry.y_events[1][0], [0, 1, 2]))
+            self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_corrupted_entry_is_a_miss(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ExposureCache(directory)
+            with open(cache.path("bad"), "wb") as bad_file:
+                bad_file.write(b"not an npz file")
+
+            self.assertIsNone(cache.get("bad"))
+            self.assertFalse(os.path.exists(cache.path("bad")))
+            self.assertEqual(cache.misses, 1)
+
+            cache.put("truncated", make_solution())
+            with open(cache.path("truncated"), "r+b") as truncated_file:
+                truncated_file.truncate(40)
+            self.assertIsNone(cache.get("truncated"))
+
+    def test_utime_failure_keeps_entry(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ExposureCache(directory)
+            cache.put("entry", make_solution())
+
+            with mock.patch("os.utime", side_effect=PermissionError):
+                self.assertIsNotNone(cache.get("entry"))
+            self.assertTrue(os.path.exists(cache.path("entry")))
+
+    def test_corrupted_entry_in_read_only_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ExposureCache(directory)
+            with open(cache.path("bad"), "wb") as bad_file:
+                bad_file.write(b"not an npz file")
+
+            with mock.patch("os.remove", side_effect=PermissionError):
+                self.assertIsNone(cache.get("bad"))
+
+    def test_failed_put_does_not_fail_exposure(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ExposureCache(directory)
+            amm = AffinityMaturationModel(exposure_cache=cache)
+            amm.exposure_to_virus(Virus(100, 10))
+
+            with mock.patch.object(cache, "put", side_effect=OSError(28, "No space")):
+                amm.exposure_to_virus(Virus(100, 20))
+
+            uncached = AffinityMaturationModel()
+            uncached.exposure_to_virus(Virus(100, 10))
+            uncached.exposure_to_virus(Virus(100, 20))
+
+            self.assertEqual(len(amm.antibody_models), 2)
+            self.assertEqual(amm.time_to_clear, uncached.time_to_clear)
+            self.assertTrue(
+                np.array_equal(
+                    amm.total_memory_cell_count[20], uncached.total_memory_cell_count[20]
+                )
+            )
+
+    def test_put_scans_only_when_over_estimate(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ExposureCache(directory, max_bytes=10**6)
+            scans = []
+            cache.evict = lambda: scans.append(True)
+
+            for key in range(20):
+                cache.put(str(key), make_solution())
+            self.assertEqual(scans, [])
+
+            cache.max_bytes = cache.estimated_bytes - 1
+            cache.put("over", make_solution())
+            self.assertEqual(scans, [True])
+
+    def test_eviction_trims_to_low_water_mark(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ExposureCache(directory)
+            for key in range(10):
+                cache.put(str(key), make_solution())
+            entry_size = os.path.getsize(cache.path("0"))
+
+            cache.max_bytes = 9 * entry_size
+            cache.low_water_fraction = 0.5
+            cache.evict()
+
+            self.assertEqual(len(os.listdir(directory)), 4)
+            self.assertEqual(cache.estimated_bytes, 4 * entry_size)
+
+    def test_eviction_removes_stale_temp_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            stale = os.path.join(directory, "stale.tmp")
+            fresh = os.path.join(directory, "fresh.tmp")
+            for path in [stale, fresh]:
+                with open(path, "wb") as temp_file:
+                    temp_file.write(b"0" * 100)
+            os.utime(stale, (1, 1))
+
+            cache = ExposureCache(directory, max_bytes=10**6)
+
+            self.assertFalse(os.path.exists(stale))
+            self.assertTrue(os.path.exists(fresh))
+            self.assertEqual(cache.estimated_bytes, 100)
+
+    def test_eviction_removes_least_recently_used(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ExposureCache(directory)
+            for key in ["a", "b", "c"]:
+                cache.put(key, make_solution())
+            entry_size = os.path.getsize(cache.path("a"))
+
+            os.utime(cache.path("a"), (1, 1))
+            os.utime(cache.path("b"), (2, 2))
+            os.utime(cache.path("c"), (3, 3))
+            # Reading "a" makes "b" the least recently used entry.
+            cache.get("a")
+
+            cache.max_bytes = 2 * entry_size
+            cache.low_water_fraction = 1
+            cache.evict()
+
+            self.assertIsNone(cache.get("b"))
+            self.assertIsNotNone(cache.get("a"))
+            self.assertIsNotNone(cache.get("c"))
+
+    def test_concurrent_writers(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ExposureCache(directory, max_bytes=10**6)
+            threads = [
+                threading.Thread(target=cache.put, args=("entry", make_solution()))
+                for _ in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(os.listdir(directory), ["entry.npz"])
+            self.assertEqual(cache.get("entry").t_events[0][0], 1.5)
+
+    def test_cached_exposures_match_solved(self):
+        with tempfile.TemporaryDirectory() as directory:
+            viruses = [Virus(100, 10), Virus(100, 20), Virus(100, 21)]
+            uncached = AffinityMaturationModel()
+            first = AffinityMaturationModel(exposure_cache=ExposureCache(directory))
+            second = AffinityMaturationModel(exposure_cache=ExposureCache(directory))
+            for amm in [uncached, first, second]:
+                for virus in viruses:
+                    amm.exposure_to_virus(virus)
+
+            self.assertEqual(first.exposure_cache.misses, 3)
+            self.assertEqual(second.exposure_cache.hits, 3)
+            self.assertEqual(uncached.time_to_clear, second.time_to_clear)
+            self.assertTrue(
+                np.array_equal(
+                    uncached.total_memory_cell_count[21],
+                    second.total_memory_cell_count[21],
+                )
+            )
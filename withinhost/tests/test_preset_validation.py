@@ -0,0 +1,54 @@
+import unittest
+
+from withinhost.preset_validation import cheapest_accurate_preset, max_deviation
+
+
+def make_report():
+    return {
+        "fast": {
+            "seconds": 1.0,
+            "time_to_clear_deviation": 5e-2,
+            "memory_cell_deviation": 4.0,
+        },
+        "default": {
+            "seconds": 2.0,
+            "time_to_clear_deviation": 1e-3,
+            "memory_cell_deviation": 0.5,
+        },
+        "reference": {
+            "seconds": 20.0,
+            "time_to_clear_deviation": 0.0,
+            "memory_cell_deviation": 0.0,
+        },
+    }
+
+
+class PresetValidationUnitTest(unittest.TestCase):
+    def test_max_deviation(self):
+        baseline = [{0: 2.0, 5: 1.5}, {0: 2.0}]
+        results = [{0: 2.1, 5: 1.5}, {0: 1.75}]
+        self.assertAlmostEqual(max_deviation(results, baseline), 0.25)
+
+        memory_baseline = [{0: [300.0], 5: [310.0, 150.0]}]
+        memory_results = [{0: [301.0], 5: [310.0, 147.0]}]
+        self.assertAlmostEqual(max_deviation(memory_results, memory_baseline), 3.0)
+
+    def test_max_deviation_mismatched_exposures(self):
+        self.assertEqual(max_deviation([{0: 1.0}], [{0: 1.0, 5: 1.0}]), float("inf"))
+        self.assertEqual(max_deviation([{0: [1.0]}], [{0: [1.0, 2.0]}]), float("inf"))
+
+    def test_max_deviation_mismatched_population(self):
+        with self.assertRaises(Exception):
+            max_deviation([{0: 1.0}], [{0: 1.0}, {0: 1.0}])
+
+    def test_cheapest_accurate_preset(self):
+        report = make_report()
+        self.assertEqual(cheapest_accurate_preset(report, 1e-1, 5), "fast")
+        self.assertEqual(cheapest_accurate_preset(report, 1e-2, 1), "default")
+        self.assertEqual(cheapest_accurate_preset(report, 0, 0), "reference")
+
+    def test_cheapest_accurate_preset_none_accurate(self):
+        report = make_report()
+        del report["reference"]
+        with self.assertRaisesRegex(Exception, "No preset"):
+            cheapest_accurate_preset(report, 1e-4, 0.1)
@@ -0,0 +1,149 @@
+from typing import List
+import unittest
+import asyncio
+import os
+import tempfile
+
+import pandas as pd
+from withinhost.simulation_service import (
+    SimulationService,
+    WORKER_COHORT_CACHE_SIZE,
+    _worker_cohorts,
+    job_key,
+    load_cohort,
+    request_simulation,
+    run_job,
+)
+
+
+def write_cohort(directory: str, people: List[int] = [1, 2, 3]) -> str:
+    rows = [
+        {"ID": person, "Year": 1968 + t, "Covariate": 0, "Infection": int(t % person == 0)}
+        for person in people
+        for t in range(6)
+    ]
+    path = os.path.join(directory, "cohort.csv")
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return path
+
+
+class SimulationServiceUnitTest(unittest.TestCase):
+    def test_run_job(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cohort = write_cohort(directory)
+            result = run_job({"cohort": cohort, "person_ids": [2, 3]})
+
+            self.assertEqual(result["person_id"], [2, 2, 2, 3, 3])
+            self.assertEqual(result["genetic_code"], [0, 10, 20, 0, 15])
+            self.assertEqual(len(result["time_to_clear"]), 5)
+            self.assertTrue(all(isinstance(x, float) for x in result["memory_cells"]))
+
+            with self.assertRaises(Exception):
+                run_job({"cohort": cohort, "drift": "not a drift"})
+
+    def test_service(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cohort = write_cohort(directory)
+            service = SimulationService(cohorts=[cohort], max_workers=1)
+            request = {"cohort": cohort, "person_ids": [1], "drift": "alternating"}
+
+            runs = []
+            run = service.run
+
+            async def counting_run(key, request):
+                runs.append(key)
+                return await run(key, request)
+
+            service.run = counting_run
+
+            async def exercise():
+                server = await service.start(port=0)
+                port = server.sockets[0].getsockname()[1]
+                try:
+                    first, second = await asyncio.gather(
+                        request_simulation(request, port=port),
+                        request_simulation(request, port=port),
+                    )
+                    # Both requests were answered by a single run.
+                    self.assertEqual(len(runs), 1)
+                    self.assertEqual(first, second)
+                    self.assertEqual(len(service.results), 1)
+                    self.assertEqual(service.in_flight, {})
+
+                    with self.assertRaises(Exception):
+                        await request_simulation(
+                            {"cohort": cohort, "drift": "not a drift"}, port=port
+                        )
+                finally:
+                    await service.close()
+                return first
+
+            result = asyncio.run(exercise())
+            self.assertEqual(result["person_id"], [1] * 6)
+
+    def test_edited_cohort_is_not_reused(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cohort = write_cohort(directory)
+            request = {"cohort": cohort}
+            key = job_key(request)
+            self.assertEqual(set(run_job(request)["person_id"]), {1, 2, 3})
+
+            write_cohort(directory, people=[1, 2, 3, 4])
+            self.assertNotEqual(key, job_key(request))
+            self.assertEqual(set(run_job(request)["person_id"]), {1, 2, 3, 4})
+
+    def test_worker_cohort_cache_is_bounded(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cohorts = []
+            for i in range(WORKER_COHORT_CACHE_SIZE + 2):
+                os.makedirs(os.path.join(directory, str(i)))
+                cohorts.append(write_cohort(os.path.join(directory, str(i))))
+                load_cohort(cohorts[-1])
+
+            self.assertNotIn(cohorts[0], _worker_cohorts)
+            self.assertIn(cohorts[-1], _worker_cohorts)
+            self.assertLessEqual(len(_worker_cohorts), WORKER_COHORT_CACHE_SIZE)
+
+    def test_service_recovers_from_dead_worker(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cohort = write_cohort(directory)
+            service = SimulationService(cohorts=[cohort], max_workers=1)
+
+            async def exercise():
+                await service.start(port=0)
+                try:
+                    loop = asyncio.get_running_loop()
+                    with self.assertRaises(Exception):
+                        await loop.run_in_executor(service.executor, os._exit, 1)
+
+                    with self.assertRaisesRegex(Exception, "restarted"):
+                        await service.submit({"cohort": cohort, "person_ids": [1]})
+                    return await service.submit({"cohort": cohort, "person_ids": [2]})
+                finally:
+                    await service.close()
+
+            result = asyncio.run(exercise())
+            self.assertEqual(result["person_id"], [2, 2, 2])
+
+    def test_oversized_request_is_answered(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cohort = write_cohort(directory)
+            service = SimulationService(cohorts=[cohort], max_workers=1, stream_limit=1024)
+
+            async def exercise():
+                server = await service.start(port=0)
+                port = server.sockets[0].getsockname()[1]
+                try:
+                    with self.assertRaisesRegex(Exception, "longer than 1024 bytes"):
+                        await request_simulation(
+                            {"cohort": cohort, "person_ids": list(range(1000))},
+                            port=port,
+                        )
+                    return await request_simulation(
+                        {"cohort": cohort, "person_ids": [3]}, port=port
+                    )
+                finally:
+                    await service.close()
+
+            result = asyncio.run(exercise())
+            self.assertEqual(result["person_id"], [3, 3])
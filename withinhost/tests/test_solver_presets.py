@@ -0,0 +1,45 @@
+import unittest
+
+from withinhost.src.person_objects.solver_presets import (
+    SolverPreset,
+    get_solver_preset,
+    SOLVER_PRESETS,
+)
+
+
+class SolverPresetUnitTest(unittest.TestCase):
+    def test_lookup(self):
+        self.assertIs(get_solver_preset("fast"), SOLVER_PRESETS["fast"])
+
+        preset = SolverPreset("custom", horizon=10)
+        self.assertIs(get_solver_preset(preset), preset)
+
+        with self.assertRaises(Exception):
+            get_solver_preset("not a preset")
+
+    def test_horizon_grows_until_event(self):
+        def zero_cross(t, y):
+            return y[0]
+
+        zero_cross.terminal = True
+        zero_cross.direction = -1
+
+        preset = SolverPreset("test", horizon=100, max_horizon=1600)
+        soln = preset.solve(fun=lambda t, y: [-1], y0=[500], events=[zero_cross])
+
+        self.assertEqual(soln.status, 1)
+        self.assertAlmostEqual(soln.t_events[0][0], 500)
+        self.assertAlmostEqual(soln.y_events[0][0][0], 0)
+
+    def test_horizon_stops_at_max(self):
+        def zero_cross(t, y):
+            return y[0]
+
+        zero_cross.terminal = True
+
+        preset = SolverPreset("test", horizon=10, max_horizon=40)
+        soln = preset.solve(fun=lambda t, y: [-1], y0=[500], events=[zero_cross])
+
+        self.assertEqual(soln.status, 0)
+        self.assertEqual(len(soln.t_events[0]), 0)
+        self.assertAlmostEqual(soln.t[-1], 40)
@@ -0,0 +1,76 @@
+import unittest
+import tempfile
+
+import numpy as np
+from withinhost.src.person_objects.affinity_maturation_model import (
+    AffinityMaturationModel,
+)
+from withinhost.src.person_objects.trajectory_recorder import TrajectoryRecorder
+
+from withinhost.src.viral_objects.virus import Virus
+
+
+class TrajectoryRecorderUnitTest(unittest.TestCase):
+    def test_should_record(self):
+        with tempfile.TemporaryDirectory() as directory:
+            recorder = TrajectoryRecorder(directory, person_ids=[1], exposures=[0, 2])
+
+            self.assertTrue(recorder.should_record(1, 0))
+            self.assertFalse(recorder.should_record(1, 1))
+            self.assertFalse(recorder.should_record(2, 0))
+
+            nobody = TrajectoryRecorder(directory, fraction=0)
+            self.assertFalse(nobody.should_record(1, 0))
+
+    def test_fraction_samples_whole_persons(self):
+        with tempfile.TemporaryDirectory() as directory:
+            recorder = TrajectoryRecorder(directory, fraction=0.5, seed=3)
+            sampled = [
+                person for person in range(200) if recorder.should_record(person, 0)
+            ]
+
+            self.assertTrue(50 < len(sampled) < 150)
+            for person in range(200):
+                chosen = [recorder.should_record(person, exposure) for exposure in range(6)]
+                self.assertEqual(chosen, [person in sampled] * 6)
+
+            other_seed = TrajectoryRecorder(directory, fraction=0.5, seed=4)
+            self.assertNotEqual(
+                sampled,
+                [person for person in range(200) if other_seed.should_record(person, 0)],
+            )
+
+    def test_records_selected_exposures(self):
+        with tempfile.TemporaryDirectory() as directory:
+            recorder = TrajectoryRecorder(directory, exposures=[1])
+            amm = AffinityMaturationModel(trajectory_recorder=recorder, person_id=7)
+            amm.exposure_to_virus(Virus(100, 10))
+            amm.exposure_to_virus(Virus(100, 20))
+
+            self.assertEqual(list(recorder.records), [(7, 1)])
+
+            trajectory = recorder.load(7, 1)
+            # Time row, viral load, and a B/M pair for each of the two models.
+            self.assertEqual(trajectory.shape[0], 1 + 1 + 2 * 2)
+            self.assertGreater(trajectory.shape[1], 2)
+            self.assertEqual(trajectory[0, 0], 0)
+            self.assertEqual(trajectory[1, 0], 100)
+            del trajectory
+
+    def test_recording_does_not_change_results(self):
+        with tempfile.TemporaryDirectory() as directory:
+            lean = AffinityMaturationModel()
+            recorded = AffinityMaturationModel(
+                trajectory_recorder=TrajectoryRecorder(directory)
+            )
+            for amm in [lean, recorded]:
+                amm.exposure_to_virus(Virus(100, 10))
+                amm.exposure_to_virus(Virus(100, 20))
+
+            self.assertEqual(lean.time_to_clear, recorded.time_to_clear)
+            self.assertTrue(
+                np.allclose(
+                    lean.total_memory_cell_count[20],
+                    recorded.total_memory_cell_count[20],
+                )
+            )